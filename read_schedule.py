@@ -1,10 +1,14 @@
-import pandas as pd
 import re
-from typing import Dict, List, Set
+from math import inf
+from typing import Dict, List
 from dataclasses import dataclass
 from collections import defaultdict
+from operator import itemgetter
 
-@dataclass
+_EMPTY_SET = frozenset()
+_SECTION_RE = re.compile(rb'^SECTION_', re.MULTILINE)
+
+@dataclass(slots=True)
 class Assignment:
     staff_id: str
     day: int
@@ -16,45 +20,52 @@ class Schedule:
         self.assignments: List[Assignment] = []
         self.staff_assignments: Dict[str, List[Assignment]] = defaultdict(list)
         self.day_shift_assignments: Dict[tuple, List[Assignment]] = defaultdict(list)
+        self.staff_shift_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        # Bit d of a staff member's mask is set iff they work on day d
+        self.staff_day_mask: Dict[str, int] = defaultdict(int)
+        
+        # Create a lookup of the shifts that cannot follow each shift
+        self.forbidden_following = {
+            shift['id']: shift['forbidden_following'] for shift in instance_data['shifts']
+        }
         
-        # Create a lookup dictionary for shifts
-        self.shifts_dict = {shift['id']: shift for shift in instance_data['shifts']}
+        # Create lookups for staff and their days off
+        self.staff_dict = {s['id']: s for s in instance_data['staff']}
+        self.days_off_set = {sid: set(days) for sid, days in instance_data['days_off'].items()}
         
-    def is_valid_assignment(self, assignment: Assignment) -> bool:
-        """Check if an assignment is valid according to all constraints."""
-        staff_id = assignment.staff_id
-        day = assignment.day
-        shift_id = assignment.shift_id
+        # Staff that can possibly work a (day, shift_id), filled lazily
+        self.eligible_staff: Dict[tuple, List[dict]] = {}
         
+    def is_valid_assignment(self, staff_id: str, day: int, shift_id: str) -> bool:
+        """Check if assigning staff_id to shift_id on day satisfies all constraints."""
         # Get staff constraints
-        staff = next(s for s in self.instance_data['staff'] if s['id'] == staff_id)
+        staff = self.staff_dict[staff_id]
+        limits = staff['shift_limits']
+        max_consec = staff['max_consecutive_shifts']
         
         # Check if staff is available on this day (not in days off)
-        if day in self.instance_data['days_off'].get(staff_id, []):
+        if day in self.days_off_set.get(staff_id, _EMPTY_SET):
             return False
             
         # Check shift limits
-        if shift_id in staff['shift_limits']:
-            current_count = sum(1 for a in self.staff_assignments[staff_id] 
-                              if a.shift_id == shift_id)
-            if current_count >= staff['shift_limits'][shift_id]:
-                return False
+        limit = limits.get(shift_id)
+        if limit is not None and self.staff_shift_counts[staff_id].get(shift_id, 0) >= limit:
+            return False
         
         # Check consecutive shifts
         if len(self.staff_assignments[staff_id]) > 0:
             last_assignment = self.staff_assignments[staff_id][-1]
             if last_assignment.day == day - 1:
-                if shift_id in self.shifts_dict[last_assignment.shift_id]['forbidden_following']:
+                if shift_id in self.forbidden_following[last_assignment.shift_id]:
                     return False
         
         # Check max consecutive shifts
-        consecutive_count = 1
-        for prev_day in range(day - 1, -1, -1):
-            if any(a.day == prev_day for a in self.staff_assignments[staff_id]):
-                consecutive_count += 1
-            else:
-                break
-        if consecutive_count > staff['max_consecutive_shifts']:
+        # The run of worked days ending at day - 1 stops at the highest
+        # unset bit below day
+        below = (1 << day) - 1
+        free = ~self.staff_day_mask[staff_id] & below
+        consecutive_count = day - free.bit_length() + 1
+        if consecutive_count > max_consec:
             return False
             
         return True
@@ -64,10 +75,22 @@ class Schedule:
         # Sort cover requirements by weight (higher weight = more important)
         cover_requirements = sorted(
             self.instance_data['cover_requirements'],
-            key=lambda x: x['weight_under'],
+            key=itemgetter('weight_under'),
             reverse=True
         )
         
+        # Bind hot names locally to avoid repeated global/attribute lookups
+        Assignment_ = Assignment
+        is_valid = self.is_valid_assignment
+        all_staff = self.instance_data['staff']
+        assignments_append = self.assignments.append
+        staff_assignments = self.staff_assignments
+        dsa = self.day_shift_assignments
+        staff_shift_counts = self.staff_shift_counts
+        staff_day_mask = self.staff_day_mask
+        days_off_set = self.days_off_set
+        eligible_staff = self.eligible_staff
+        
         # Try to fill each requirement
         for req in cover_requirements:
             day = req['day']
@@ -75,30 +98,41 @@ class Schedule:
             required = req['requirement']
             
             # Get current assignments for this day and shift
-            current_assignments = self.day_shift_assignments.get((day, shift_id), [])
+            current_assignments = dsa[(day, shift_id)]
             needed = required - len(current_assignments)
             
             if needed <= 0:
                 continue
                 
-            # Try to assign staff members
-            for staff in self.instance_data['staff']:
-                if needed <= 0:
+            # Skip staff who are off that day or may never work this shift
+            eligible = eligible_staff.get((day, shift_id))
+            if eligible is None:
+                eligible = [
+                    s for s in all_staff
+                    if day not in days_off_set.get(s['id'], _EMPTY_SET)
+                    and s['shift_limits'].get(shift_id, inf) > 0
+                ]
+                eligible_staff[(day, shift_id)] = eligible
+            
+            # Try the least loaded staff first to spread shifts evenly
+            ordered = sorted(eligible, key=lambda s: len(staff_assignments[s['id']]))
+            
+            # Try to assign staff members until the requirement is met
+            candidates = iter(ordered)
+            while needed > 0:
+                staff = next(candidates, None)
+                if staff is None:
                     break
-                    
-                # Create potential assignment
-                potential_assignment = Assignment(
-                    staff_id=staff['id'],
-                    day=day,
-                    shift_id=shift_id
-                )
                 
                 # Check if assignment is valid
-                if self.is_valid_assignment(potential_assignment):
+                if is_valid(staff['id'], day, shift_id):
                     # Make the assignment
-                    self.assignments.append(potential_assignment)
-                    self.staff_assignments[staff['id']].append(potential_assignment)
-                    self.day_shift_assignments[(day, shift_id)].append(potential_assignment)
+                    potential_assignment = Assignment_(staff['id'], day, shift_id)
+                    assignments_append(potential_assignment)
+                    staff_assignments[staff['id']].append(potential_assignment)
+                    current_assignments.append(potential_assignment)
+                    staff_shift_counts[staff['id']][shift_id] += 1
+                    staff_day_mask[staff['id']] |= 1 << day
                     needed -= 1
             
             # If we couldn't fill all requirements, the schedule is incomplete
@@ -107,123 +141,127 @@ class Schedule:
                 
         return True
 
+def _parse_horizon(lines):
+    return 'horizon', int(lines[0])
+
+def _parse_shifts(lines):
+    shifts = []
+    for line in lines:
+        shift_id, length, forbidden = line.decode().split(',')
+        forbidden = frozenset(forbidden.split('|')) if forbidden else frozenset()
+        shifts.append({
+            'id': shift_id,
+            'length': int(length),
+            'forbidden_following': forbidden
+        })
+    return 'shifts', shifts
+
+def _parse_staff(lines):
+    staff = []
+    for line in lines:
+        parts = line.split(b',')
+        staff_id = parts[0].decode()
+        shift_limits = parts[1].split(b'|')
+        shift_limits_dict = {}
+        for limit in shift_limits:
+            if b'=' in limit:
+                shift, max_count = limit.split(b'=')
+                shift_limits_dict[shift.decode()] = int(max_count)
+        
+        # Create staff entry with all fields
+        staff_entry = {
+            'id': staff_id,
+            'shift_limits': shift_limits_dict,
+            'max_shifts': int(parts[2]),
+            'max_total_minutes': int(parts[3]),
+            'min_total_minutes': int(parts[4]),
+            'max_consecutive_shifts': int(parts[5]),
+            'min_consecutive_shifts': int(parts[6]),
+            'min_consecutive_days_off': int(parts[7])
+        }
+        
+        # Add max_weekends if it exists
+        if len(parts) > 8:
+            staff_entry['max_weekends'] = int(parts[8])
+        
+        staff.append(staff_entry)
+    return 'staff', staff
+
+def _parse_days_off(lines):
+    days_off = {}
+    for line in lines:
+        staff_id, *days = line.split(b',')
+        days_off[staff_id.decode()] = [int(day) for day in days]
+    return 'days_off', days_off
+
+# LOSS FUNCTION INPUT
+def _parse_shift_requests(lines):
+    requests = []
+    for line in lines:
+        staff_id, day, shift_id, weight = line.split(b',')
+        requests.append({
+            'staff_id': staff_id.decode(),
+            'day': int(day),
+            'shift_id': shift_id.decode(),
+            'weight': int(weight)
+        })
+    return requests
+
+def _parse_shift_on_requests(lines):
+    return 'shift_on_requests', _parse_shift_requests(lines)
+
+def _parse_shift_off_requests(lines):
+    return 'shift_off_requests', _parse_shift_requests(lines)
+
+def _parse_cover(lines):
+    cover_requirements = []
+    for line in lines:
+        day, shift_id, requirement, weight_under, weight_over = line.split(b',')
+        cover_requirements.append({
+            'day': int(day),
+            'shift_id': shift_id.decode(),
+            'requirement': int(requirement),
+            'weight_under': int(weight_under),
+            'weight_over': int(weight_over)
+        })
+    return 'cover_requirements', cover_requirements
+
+# Map each section name to a parser returning (instance_data key, value)
+_SECTION_PARSERS = {
+    'HORIZON': _parse_horizon,
+    'SHIFTS': _parse_shifts,
+    'STAFF': _parse_staff,
+    'DAYS_OFF': _parse_days_off,
+    'SHIFT_ON_REQUESTS': _parse_shift_on_requests,
+    'SHIFT_OFF_REQUESTS': _parse_shift_off_requests,
+    'COVER': _parse_cover,
+}
+
 def read_instance_file(file_path):
     """
     Read and parse an instance file for the scheduling problem.
     Returns a dictionary containing all sections of the instance.
     """
-    with open(file_path, 'r') as f:
+    with open(file_path, 'rb') as f:
         content = f.read()
     
     # Split content into sections
-    sections = re.split(r'SECTION_', content)[1:]
+    sections = _SECTION_RE.split(content)[1:]
     instance_data = {}
     
     for section in sections:
-        section_name, *section_content = section.strip().split('\n', 1)
-        section_content = section_content[0] if section_content else ""
+        section_name, *section_content = section.strip().split(b'\n', 1)
+        section_name = section_name.strip().decode('ascii')
+        section_content = section_content[0] if section_content else b""
         
-        lines = [line.strip() for line in section_content.split('\n') 
-                if line.strip() and not line.startswith('#')]
+        parser = _SECTION_PARSERS.get(section_name)
+        if parser is None:
+            continue
         
-        if section_name == 'HORIZON':
-            instance_data['horizon'] = int(lines[0])
-            
-        elif section_name == 'SHIFTS':
-            shifts = []
-            for line in lines:
-                shift_id, length, forbidden = line.split(',')
-                forbidden = forbidden.split('|') if forbidden else []
-                shifts.append({
-                    'id': shift_id,
-                    'length': int(length),
-                    'forbidden_following': forbidden
-                })
-            instance_data['shifts'] = shifts
-        
-        elif section_name == 'SECTION_DAYS_OFF':
-            days_off = {}
-            for line in lines:
-                staff_id, *days = line.split(',')
-                days_off[staff_id] = [int(day) for day in days]
-            instance_data['days_off'] = days_off
-            
-        elif section_name == 'STAFF':
-            staff = []
-            for line in lines:
-                parts = line.split(',')
-                staff_id = parts[0]
-                shift_limits = parts[1].split('|')
-                shift_limits_dict = {}
-                for limit in shift_limits:
-                    if '=' in limit:
-                        shift, max_count = limit.split('=')
-                        shift_limits_dict[shift] = int(max_count)
-                
-                # Create staff entry with all fields
-                staff_entry = {
-                    'id': staff_id,
-                    'shift_limits': shift_limits_dict,
-                    'max_shifts': int(parts[2]),
-                    'max_total_minutes': int(parts[3]),
-                    'min_total_minutes': int(parts[4]),
-                    'max_consecutive_shifts': int(parts[5]),
-                    'min_consecutive_shifts': int(parts[6]),
-                    'min_consecutive_days_off': int(parts[7])
-                }
-                
-                # Add max_weekends if it exists
-                if len(parts) > 8:
-                    staff_entry['max_weekends'] = int(parts[8])
-                
-                staff.append(staff_entry)
-            instance_data['staff'] = staff
-            
-        elif section_name == 'DAYS_OFF':
-            days_off = {}
-            for line in lines:
-                staff_id, *days = line.split(',')
-                days_off[staff_id] = [int(day) for day in days]
-            instance_data['days_off'] = days_off
-
-
-        # LOSS FUNCTION INPUT
-        elif section_name == 'SHIFT_ON_REQUESTS':
-            shift_on_requests = []
-            for line in lines:
-                staff_id, day, shift_id, weight = line.split(',')
-                shift_on_requests.append({
-                    'staff_id': staff_id,
-                    'day': int(day),
-                    'shift_id': shift_id,
-                    'weight': int(weight)
-                })
-            instance_data['shift_on_requests'] = shift_on_requests
-            
-        elif section_name == 'SHIFT_OFF_REQUESTS':
-            shift_off_requests = []
-            for line in lines:
-                staff_id, day, shift_id, weight = line.split(',')
-                shift_off_requests.append({
-                    'staff_id': staff_id,
-                    'day': int(day),
-                    'shift_id': shift_id,
-                    'weight': int(weight)
-                })
-            instance_data['shift_off_requests'] = shift_off_requests
-            
-        elif section_name == 'COVER':
-            cover_requirements = []
-            for line in lines:
-                day, shift_id, requirement, weight_under, weight_over = line.split(',')
-                cover_requirements.append({
-                    'day': int(day),
-                    'shift_id': shift_id,
-                    'requirement': int(requirement),
-                    'weight_under': int(weight_under),
-                    'weight_over': int(weight_over)
-                })
-            instance_data['cover_requirements'] = cover_requirements
+        lines = [line.strip() for line in section_content.splitlines() 
+                if line.strip() and not line.startswith(b'#')]
+        key, value = parser(lines)
+        instance_data[key] = value
     
     return instance_data
 